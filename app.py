@@ -1,8 +1,11 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template_string
+from flask import Flask, Response, request, jsonify, send_from_directory, render_template_string
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
 import logging
+import time
 from datetime import datetime
 import json
 
@@ -10,7 +13,7 @@ import json
 try:
     from dpr_analyzer import DPRAnalyzer
     from risk_predictor import RiskPredictor
-    from pdf_processor import PDFProcessor
+    from pdf_processor import PDFProcessor, SAMPLE_DPR_TEXT
     from report_generator import ReportGenerator
     from database_manager import DatabaseManager
     MODULES_AVAILABLE = True
@@ -26,19 +29,19 @@ app = Flask(__name__)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'txt', 'doc', 'docx'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+# Worker pool for independent analysis stages
+executor = ThreadPoolExecutor(max_workers=4)
+
 # Ensure directories exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs('reports', exist_ok=True)
 os.makedirs('logs', exist_ok=True)
 
-# Initialize components if available
+# Initialize components if available (runs once in the gunicorn master with --preload)
 if MODULES_AVAILABLE:
     try:
         dpr_analyzer = DPRAnalyzer()
@@ -51,16 +54,35 @@ if MODULES_AVAILABLE:
         logger.error(f"Error initializing modules: {e}")
         MODULES_AVAILABLE = False
 
+# Cache the main page; it is static for the lifetime of the process
+try:
+    with open('index.html', 'rb') as f:
+        INDEX_HTML = f.read()
+except FileNotFoundError:
+    INDEX_HTML = None
+
+# (epoch second, ISO timestamp, compact timestamp) for the last formatted second
+_timestamp_cache = (0, '', '')
+
+def current_timestamps():
+    """Return (ISO, '%Y%m%d_%H%M%S') timestamps, formatting at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached = _timestamp_cache
+    if cached[0] != now:
+        dt = datetime.fromtimestamp(now)
+        cached = _timestamp_cache = (now, dt.isoformat(), dt.strftime('%Y%m%d_%H%M%S'))
+    return cached[1], cached[2]
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/')
 def index():
     """Serve the main HTML file"""
-    try:
-        with open('index.html', 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
+    if INDEX_HTML is not None:
+        return Response(INDEX_HTML, mimetype='text/html')
+    else:
         return render_template_string("""
         <!DOCTYPE html>
         <html>
@@ -84,7 +106,7 @@ def serve_js():
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': current_timestamps()[0],
         'modules_loaded': MODULES_AVAILABLE
     })
 
@@ -101,44 +123,69 @@ def upload_file():
         if not allowed_file(file.filename):
             return jsonify({'error': 'File type not allowed'}), 400
         
-        # Save file
+        # Read file into memory; it never needs to touch disk
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        uploaded_at, timestamp = current_timestamps()
         filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        file_bytes = file.read()
+        file_hash = hashlib.sha256(file_bytes).hexdigest()
         
         logger.info(f"File uploaded: {filename}")
         
         # Perform analysis
         if MODULES_AVAILABLE:
-            text_content = pdf_processor.extract_text(filepath)
-            analysis_result = dpr_analyzer.analyze_dpr(text_content, filename)
-            risk_analysis = risk_predictor.predict_risks(analysis_result)
-            
-            result = {
-                'analysis_id': timestamp,
-                'file_info': {
-                    'filename': file.filename,
-                    'uploaded_at': datetime.now().isoformat(),
-                    'file_size': os.path.getsize(filepath)
-                },
-                'analysis': analysis_result,
-                'risks': risk_analysis,
-                'recommendations': dpr_analyzer.generate_recommendations(analysis_result)
+            file_info = {
+                'filename': file.filename,
+                'uploaded_at': uploaded_at,
+                'file_size': len(file_bytes),
+                'file_hash': file_hash
             }
             
-            # Store in database
-            db_manager.store_analysis(result)
+            # Identical documents were already analyzed; reuse the results but
+            # stamp them with this upload's details
+            cached_result = db_manager.get_analysis_by_hash(file_hash)
+            if cached_result:
+                logger.info(f"Reusing stored analysis for duplicate upload: {filename}")
+                result = {
+                    **cached_result,
+                    'analysis_id': timestamp,
+                    'file_info': file_info,
+                    'analysis': {**cached_result.get('analysis', {}), 'filename': filename}
+                }
+            else:
+                text_content = pdf_processor.extract_text_from_bytes(file_bytes, filename)
+                analysis_result = dpr_analyzer.analyze_dpr(text_content, filename)
+                
+                # Risk prediction and recommendations only depend on the analysis
+                risk_future = executor.submit(risk_predictor.predict_risks, analysis_result)
+                recommendations_future = executor.submit(dpr_analyzer.generate_recommendations, analysis_result)
+                risk_analysis = risk_future.result()
+                
+                # Results from the sample fallback text say nothing about this file,
+                # so they are stored without a hash and never reused for duplicates
+                if text_content is SAMPLE_DPR_TEXT:
+                    file_info['file_hash'] = None
+                
+                result = {
+                    'analysis_id': timestamp,
+                    'file_info': file_info,
+                    'analysis': analysis_result,
+                    'risks': risk_analysis,
+                    'recommendations': recommendations_future.result()
+                }
+            
+            # Store before responding so the returned ID can be used for reports
+            # and duplicate lookups straight away
+            analysis_id = db_manager.store_analysis(result)
+            if analysis_id:
+                result['analysis_id'] = analysis_id
+            else:
+                logger.warning(f"Analysis of {filename} could not be stored; reports will be unavailable")
             
         else:
             # Fallback demo data
             result = generate_demo_data(file.filename)
         
-        # Clean up
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        
         return jsonify(result)
         
     except Exception as e:
@@ -170,56 +217,65 @@ def generate_report_endpoint(analysis_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Static demo payload; generate_demo_data only stamps the per-request fields
+DEMO_DATA_TEMPLATE = {
+    'analysis_id': None,
+    'file_info': {
+        'filename': None,
+        'uploaded_at': None,
+        'file_size': 1024000
+    },
+    'analysis': {
+        'filename': None,
+        'overall_score': 78,
+        'completeness_percentage': 80,
+        'section_analyses': {
+            'Context/Background': {'score': 85, 'completeness': 90, 'quality': 80},
+            'Problems Addressed': {'score': 90, 'completeness': 95, 'quality': 85},
+            'Project Objectives': {'score': 75, 'completeness': 80, 'quality': 70},
+            'Technology Issues': {'score': 70, 'completeness': 75, 'quality': 65},
+            'Management Arrangements': {'score': 80, 'completeness': 85, 'quality': 75},
+            'Means of Finance': {'score': 75, 'completeness': 80, 'quality': 70},
+            'Time Frame': {'score': 65, 'completeness': 70, 'quality': 60},
+            'Target Beneficiaries': {'score': 85, 'completeness': 90, 'quality': 80},
+            'Legal Framework': {'score': 80, 'completeness': 85, 'quality': 75},
+            'Risk Analysis': {'score': 60, 'completeness': 65, 'quality': 55}
+        },
+        'quality_scores': {
+            'data_accuracy': 82,
+            'completeness': 78,
+            'technical_viability': 74,
+            'compliance': 85,
+            'budget_realism': 70
+        }
+    },
+    'risks': {
+        'overall_risk': {'level': 'Medium', 'score': 55.0},
+        'risk_predictions': {
+            'Budget Overrun Risk': {'probability': 70, 'level': 'High', 'severity': 'Medium'},
+            'Timeline Delay Risk': {'probability': 55, 'level': 'Medium', 'severity': 'Low'},
+            'Technical Implementation Risk': {'probability': 65, 'level': 'High', 'severity': 'High'},
+            'Compliance Risk': {'probability': 25, 'level': 'Low', 'severity': 'Low'},
+            'Resource Availability Risk': {'probability': 45, 'level': 'Medium', 'severity': 'Medium'}
+        }
+    },
+    'recommendations': [
+        {'priority': 'High', 'category': 'Risk Analysis', 'recommendation': 'Enhance risk analysis section with detailed mitigation strategies'},
+        {'priority': 'Medium', 'category': 'Timeline', 'recommendation': 'Provide more realistic timeline with buffer periods'},
+        {'priority': 'Medium', 'category': 'Budget', 'recommendation': 'Include detailed cost breakdown with market analysis'},
+        {'priority': 'Low', 'category': 'Technical', 'recommendation': 'Add technical feasibility validation studies'}
+    ]
+}
+
 def generate_demo_data(filename="Demo_Project.pdf"):
     """Generate realistic demo data"""
-    return {
-        'analysis_id': 'demo_' + datetime.now().strftime('%Y%m%d_%H%M%S'),
-        'file_info': {
-            'filename': filename,
-            'uploaded_at': datetime.now().isoformat(),
-            'file_size': 1024000
-        },
-        'analysis': {
-            'filename': filename,
-            'overall_score': 78,
-            'completeness_percentage': 80,
-            'section_analyses': {
-                'Context/Background': {'score': 85, 'completeness': 90, 'quality': 80},
-                'Problems Addressed': {'score': 90, 'completeness': 95, 'quality': 85},
-                'Project Objectives': {'score': 75, 'completeness': 80, 'quality': 70},
-                'Technology Issues': {'score': 70, 'completeness': 75, 'quality': 65},
-                'Management Arrangements': {'score': 80, 'completeness': 85, 'quality': 75},
-                'Means of Finance': {'score': 75, 'completeness': 80, 'quality': 70},
-                'Time Frame': {'score': 65, 'completeness': 70, 'quality': 60},
-                'Target Beneficiaries': {'score': 85, 'completeness': 90, 'quality': 80},
-                'Legal Framework': {'score': 80, 'completeness': 85, 'quality': 75},
-                'Risk Analysis': {'score': 60, 'completeness': 65, 'quality': 55}
-            },
-            'quality_scores': {
-                'data_accuracy': 82,
-                'completeness': 78,
-                'technical_viability': 74,
-                'compliance': 85,
-                'budget_realism': 70
-            }
-        },
-        'risks': {
-            'overall_risk': {'level': 'Medium', 'score': 55.0},
-            'risk_predictions': {
-                'Budget Overrun Risk': {'probability': 70, 'level': 'High', 'severity': 'Medium'},
-                'Timeline Delay Risk': {'probability': 55, 'level': 'Medium', 'severity': 'Low'},
-                'Technical Implementation Risk': {'probability': 65, 'level': 'High', 'severity': 'High'},
-                'Compliance Risk': {'probability': 25, 'level': 'Low', 'severity': 'Low'},
-                'Resource Availability Risk': {'probability': 45, 'level': 'Medium', 'severity': 'Medium'}
-            }
-        },
-        'recommendations': [
-            {'priority': 'High', 'category': 'Risk Analysis', 'recommendation': 'Enhance risk analysis section with detailed mitigation strategies'},
-            {'priority': 'Medium', 'category': 'Timeline', 'recommendation': 'Provide more realistic timeline with buffer periods'},
-            {'priority': 'Medium', 'category': 'Budget', 'recommendation': 'Include detailed cost breakdown with market analysis'},
-            {'priority': 'Low', 'category': 'Technical', 'recommendation': 'Add technical feasibility validation studies'}
-        ]
-    }
+    uploaded_at, timestamp = current_timestamps()
+    # Shallow copies: only the stamped dicts are new, static parts are shared
+    demo_data = dict(DEMO_DATA_TEMPLATE)
+    demo_data['analysis_id'] = 'demo_' + timestamp
+    demo_data['file_info'] = {**DEMO_DATA_TEMPLATE['file_info'], 'filename': filename, 'uploaded_at': uploaded_at}
+    demo_data['analysis'] = {**DEMO_DATA_TEMPLATE['analysis'], 'filename': filename}
+    return demo_data
 
 def generate_text_report(analysis_id):
     """Generate simple text report"""
@@ -261,9 +317,11 @@ Generated by MDoNER DPR Assessment System
 
 if __name__ == '__main__':
     print("🚀 Starting MDoNER DPR Assessment System...")
-    print("📁 Upload folder:", os.path.abspath(UPLOAD_FOLDER))
     print("🌐 Server starting at: http://localhost:5000")
     print("💡 Open your browser and navigate to the URL above")
+    print("⚙️  For production, run under gunicorn (see README)")
     print("")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs app:app under gunicorn
+    debug = os.environ.get('FLASK_ENV', 'development') == 'development'
+    app.run(debug=debug, threaded=True, host='0.0.0.0', port=5000)
@@ -7,21 +7,144 @@ import sqlite3
 import json
 import logging
 import os
+import re
+import threading
+import time
 from datetime import datetime
 import uuid
+import zlib
+
+# Prefer orjson for the (de)serialization hot paths
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+def _json_default(obj):
+    """Convert NumPy scalars and other int/float subclasses orjson rejects"""
+    if isinstance(obj, float):
+        return float(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_bytes(obj, indent=False):
+    """Serialize to UTF-8 encoded JSON"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_json_default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode('utf-8')
+
+def _dumps(obj, indent=False):
+    """Serialize to a JSON string"""
+    return _dumps_bytes(obj, indent).decode('utf-8')
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+_EMPTY_JSON_LIST = '[]'
+
+def _dumps_list(values):
+    """Serialize a list column, skipping the encoder for the common empty case"""
+    return _dumps(values) if values else _EMPTY_JSON_LIST
+
+def _uuid7():
+    """Generate a time-ordered UUIDv7 so new primary keys append to the B-tree"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80    # 48-bit unix ms timestamp
+    value |= 0x7 << 76                              # version 7
+    value |= (rand >> 68) << 64                     # 12 random bits
+    value |= 0b10 << 62                             # RFC 4122 variant
+    value |= rand & 0x3FFFFFFFFFFFFFFF              # 62 random bits
+    return uuid.UUID(int=value)
+
+def _analysis_json(stored_value):
+    """Return the JSON text of a stored analysis (compressed blob or legacy plain text)"""
+    if isinstance(stored_value, bytes):
+        return zlib.decompress(stored_value).decode('utf-8')
+    return stored_value
+
+def _load_analysis(stored_value):
+    """Parse a stored analysis without decoding the decompressed bytes first"""
+    if isinstance(stored_value, bytes):
+        stored_value = zlib.decompress(stored_value)
+    return _loads(stored_value)
+
+# contentless_delete lets a contentless FTS5 table delete rows by rowid alone
+FTS_CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+
+def _search_text(analysis_data):
+    """Searchable text of an analysis: section findings, recommendations and risk details"""
+    parts = []
+    analysis = analysis_data.get('analysis') or {}
+    for section_name, section_data in (analysis.get('section_analyses') or {}).items():
+        parts.append(section_name)
+        parts.extend(section_data.get('issues') or [])
+        parts.extend(section_data.get('recommendations') or [])
+    
+    for rec in analysis_data.get('recommendations') or []:
+        parts.append(rec.get('category'))
+        parts.append(rec.get('recommendation'))
+    
+    risks = analysis_data.get('risks') or {}
+    for risk_category, risk_data in (risks.get('risk_predictions') or {}).items():
+        parts.append(risk_category)
+        parts.append(risk_data.get('level'))
+        parts.extend(risk_data.get('primary_factors') or [])
+        parts.extend(risk_data.get('mitigation_suggestions') or [])
+    parts.append(risks.get('risk_summary'))
+    
+    return '\n'.join(part for part in parts if isinstance(part, str))
+
 class DatabaseManager:
     def __init__(self, db_path='dpr_analysis.db'):
         self.db_path = db_path
+        # One shared connection per process; the lock serializes access
+        # across Flask worker threads
+        self._lock = threading.RLock()
+        self._connection = self._connect()
+        self._pid = os.getpid()
+        self.fts_enabled = False
         self.init_database()
         logger.info(f"Database Manager initialized with database: {db_path}")
 
+    def _connect(self):
+        """Open and configure a connection to the database"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        
+        # Lets SQL (LIKE search and FTS maintenance) read the compressed analysis_data column
+        conn.create_function('analysis_json', 1, _analysis_json, deterministic=True)
+        
+        # Tune journaling and caching (WAL persists in the database file,
+        # the rest is per-connection)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        # Checkpoint in larger batches instead of after every small upload
+        conn.execute('PRAGMA wal_autocheckpoint=10000')
+        
+        return conn
+
+    @property
+    def _conn(self):
+        """Shared connection, reopened in a forked child (e.g. gunicorn --preload)"""
+        if self._pid != os.getpid():
+            # SQLite connections must not be used across fork()
+            self._connection = self._connect()
+            self._pid = os.getpid()
+        return self._connection
+
     def init_database(self):
         """Initialize database with required tables"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
                 # Create analyses table
@@ -34,10 +157,16 @@ class DatabaseManager:
                         risk_level TEXT,
                         completeness_percentage REAL,
                         analysis_data TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        file_hash TEXT
                     )
                 ''')
                 
+                # Add file_hash to databases created before upload de-duplication
+                cursor.execute('PRAGMA table_info(analyses)')
+                if 'file_hash' not in [column[1] for column in cursor.fetchall()]:
+                    cursor.execute('ALTER TABLE analyses ADD COLUMN file_hash TEXT')
+                
                 # Create sections table
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS analysis_sections (
@@ -83,10 +212,14 @@ class DatabaseManager:
                 # Create indexes for better performance
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_date ON analyses (analyzed_at)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses (overall_score)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_hash ON analyses (file_hash)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_sections_analysis ON analysis_sections (analysis_id)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_risks_analysis ON analysis_risks (analysis_id)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_recommendations_analysis ON analysis_recommendations (analysis_id)')
                 
+                # Full-text index for search_analyses
+                self.fts_enabled = self._init_fts(cursor)
+                
                 conn.commit()
                 logger.info("Database initialized successfully")
                 
@@ -94,80 +227,179 @@ class DatabaseManager:
             logger.error(f"Error initializing database: {str(e)}")
             raise
 
+    def _init_fts(self, cursor):
+        """Create the FTS5 search index if supported"""
+        try:
+            # store_analysis and the delete paths keep the index in sync. Triggers
+            # would need the analysis_json() Python function, so they broke
+            # writes from any other SQLite client; drop ones left by older versions
+            for trigger in ('analyses_fts_insert', 'analyses_fts_delete', 'analyses_fts_update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            
+            # Contentless: only the inverted index is stored, never a second copy
+            # of the text; hits are resolved by rowid against analyses
+            options = "content='', contentless_delete=1" if FTS_CONTENTLESS_DELETE else "content=''"
+            create_sql = f'CREATE VIRTUAL TABLE analyses_fts USING fts5(filename, search_text, {options})'
+            
+            # Rebuild an index left by an older layout
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'analyses_fts'")
+            row = cursor.fetchone()
+            if row and row[0] != create_sql:
+                cursor.execute('DROP TABLE analyses_fts')
+                row = None
+            
+            if row is None:
+                cursor.execute(create_sql)
+                
+                # Index rows stored before the search table existed
+                cursor.execute('SELECT rowid, filename, analysis_data FROM analyses')
+                entries = []
+                for rowid, filename, stored_value in cursor.fetchall():
+                    try:
+                        analysis_data = _load_analysis(stored_value) if stored_value else {}
+                    except (zlib.error, ValueError):
+                        analysis_data = {}
+                    entries.append((rowid, filename, _search_text(analysis_data)))
+                cursor.executemany(
+                    'INSERT INTO analyses_fts (rowid, filename, search_text) VALUES (?, ?, ?)', entries
+                )
+            
+            return True
+            
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 not available, falling back to LIKE search: {e}")
+            return False
+
+    def _unindex_analyses(self, cursor, where_clause, params):
+        """Remove the analyses matching where_clause from the search index before they are deleted"""
+        if not self.fts_enabled:
+            return
+        
+        if FTS_CONTENTLESS_DELETE:
+            cursor.execute(
+                f'DELETE FROM analyses_fts WHERE rowid IN (SELECT rowid FROM analyses WHERE {where_clause})',
+                params
+            )
+            return
+        
+        # Older SQLite can only drop a contentless row given the values it was
+        # indexed with; rows another client inserted were never indexed
+        cursor.execute(f'''
+            SELECT rowid, filename, analysis_data FROM analyses
+            WHERE {where_clause} AND rowid IN (SELECT rowid FROM analyses_fts)
+        ''', params)
+        entries = []
+        for rowid, filename, stored_value in cursor.fetchall():
+            try:
+                analysis_data = _load_analysis(stored_value) if stored_value else {}
+            except (zlib.error, ValueError):
+                analysis_data = {}
+            entries.append((rowid, filename, _search_text(analysis_data)))
+        cursor.executemany('''
+            INSERT INTO analyses_fts (analyses_fts, rowid, filename, search_text)
+            VALUES ('delete', ?, ?, ?)
+        ''', entries)
+
+    @staticmethod
+    def _build_fts_query(search_term):
+        """Turn free text into an FTS5 prefix query (all terms must match)"""
+        tokens = re.findall(r'\w+', search_term or '')
+        return ' '.join(f'"{token}"*' for token in tokens)
+
     def store_analysis(self, analysis_data):
-        """Store complete analysis result in database"""
+        """Store complete analysis result in database and return its new ID (None on failure)"""
         try:
-            analysis_id = str(uuid.uuid4())
+            analysis_id = str(_uuid7())
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
+                # Take the write lock up front rather than upgrading mid-transaction
+                cursor.execute('BEGIN IMMEDIATE')
+                
                 # Store main analysis record
                 file_info = analysis_data.get('file_info', {})
                 analysis = analysis_data.get('analysis', {})
                 risks = analysis_data.get('risks', {})
+                filename = file_info.get('filename', 'Unknown')
+                
+                # The stored copy carries the ID it can be fetched by
+                stored_json = _dumps_bytes({**analysis_data, 'analysis_id': analysis_id})
                 
                 cursor.execute('''
                     INSERT INTO analyses 
-                    (id, filename, overall_score, risk_level, completeness_percentage, analysis_data)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (id, filename, overall_score, risk_level, completeness_percentage, analysis_data, file_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     analysis_id,
-                    file_info.get('filename', 'Unknown'),
+                    filename,
                     analysis.get('overall_score', 0),
                     risks.get('overall_risk', {}).get('level', 'Unknown'),
                     analysis.get('completeness_percentage', 0),
-                    json.dumps(analysis_data)
+                    zlib.compress(stored_json),
+                    file_info.get('file_hash')
                 ))
                 
+                if self.fts_enabled:
+                    cursor.execute(
+                        'INSERT INTO analyses_fts (rowid, filename, search_text) VALUES (?, ?, ?)',
+                        (cursor.lastrowid, filename, _search_text(analysis_data))
+                    )
+                
                 # Store section analyses
                 section_analyses = analysis.get('section_analyses', {})
-                for section_name, section_data in section_analyses.items():
-                    cursor.execute('''
-                        INSERT INTO analysis_sections 
-                        (analysis_id, section_name, score, completeness, quality, issues, recommendations)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
+                cursor.executemany('''
+                    INSERT INTO analysis_sections 
+                    (analysis_id, section_name, score, completeness, quality, issues, recommendations)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (
                         analysis_id,
                         section_name,
                         section_data.get('score', 0),
                         section_data.get('completeness', 0),
                         section_data.get('quality', 0),
-                        json.dumps(section_data.get('issues', [])),
-                        json.dumps(section_data.get('recommendations', []))
-                    ))
+                        _dumps_list(section_data.get('issues')),
+                        _dumps_list(section_data.get('recommendations'))
+                    )
+                    for section_name, section_data in section_analyses.items()
+                ])
                 
                 # Store risk predictions
                 risk_predictions = risks.get('risk_predictions', {})
-                for risk_category, risk_data in risk_predictions.items():
-                    cursor.execute('''
-                        INSERT INTO analysis_risks 
-                        (analysis_id, risk_category, probability, risk_level, severity, 
-                         primary_factors, mitigation_suggestions)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
+                cursor.executemany('''
+                    INSERT INTO analysis_risks 
+                    (analysis_id, risk_category, probability, risk_level, severity, 
+                     primary_factors, mitigation_suggestions)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (
                         analysis_id,
                         risk_category,
                         risk_data.get('probability', 0),
                         risk_data.get('level', 'Unknown'),
                         risk_data.get('severity', 'Unknown'),
-                        json.dumps(risk_data.get('primary_factors', [])),
-                        json.dumps(risk_data.get('mitigation_suggestions', []))
-                    ))
+                        _dumps_list(risk_data.get('primary_factors')),
+                        _dumps_list(risk_data.get('mitigation_suggestions'))
+                    )
+                    for risk_category, risk_data in risk_predictions.items()
+                ])
                 
                 # Store recommendations
                 recommendations = analysis_data.get('recommendations', [])
-                for rec in recommendations:
-                    cursor.execute('''
-                        INSERT INTO analysis_recommendations 
-                        (analysis_id, priority, category, recommendation)
-                        VALUES (?, ?, ?, ?)
-                    ''', (
+                cursor.executemany('''
+                    INSERT INTO analysis_recommendations 
+                    (analysis_id, priority, category, recommendation)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (
                         analysis_id,
                         rec.get('priority', 'Medium'),
                         rec.get('category', 'General'),
                         rec.get('recommendation', '')
-                    ))
+                    )
+                    for rec in recommendations
+                ])
                 
                 conn.commit()
                 logger.info(f"Analysis stored successfully with ID: {analysis_id}")
@@ -180,7 +412,7 @@ class DatabaseManager:
     def get_analysis(self, analysis_id):
         """Retrieve analysis by ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -189,7 +421,7 @@ class DatabaseManager:
                 
                 result = cursor.fetchone()
                 if result:
-                    return json.loads(result[0])
+                    return _load_analysis(result[0])
                 else:
                     return None
                     
@@ -197,11 +429,35 @@ class DatabaseManager:
             logger.error(f"Error retrieving analysis {analysis_id}: {str(e)}")
             return None
 
+    def get_analysis_by_hash(self, file_hash):
+        """Retrieve the most recent analysis of a file with the given SHA-256 digest"""
+        try:
+            with self._lock, self._conn as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT analysis_data FROM analyses 
+                    WHERE file_hash = ? 
+                    ORDER BY analyzed_at DESC 
+                    LIMIT 1
+                ''', (file_hash,))
+                
+                result = cursor.fetchone()
+                if result:
+                    return _load_analysis(result[0])
+                else:
+                    return None
+                    
+        except Exception as e:
+            logger.error(f"Error retrieving analysis by hash {file_hash}: {str(e)}")
+            return None
+
     def get_analysis_history(self, limit=10, offset=0):
         """Get analysis history with pagination"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 
                 cursor.execute('''
                     SELECT id, filename, analyzed_at, overall_score, risk_level, completeness_percentage
@@ -210,20 +466,7 @@ class DatabaseManager:
                     LIMIT ? OFFSET ?
                 ''', (limit, offset))
                 
-                results = cursor.fetchall()
-                
-                history = []
-                for row in results:
-                    history.append({
-                        'id': row[0],
-                        'filename': row[1],
-                        'analyzed_at': row[2],
-                        'overall_score': row[3],
-                        'risk_level': row[4],
-                        'completeness_percentage': row[5]
-                    })
-                
-                return history
+                return [dict(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             logger.error(f"Error retrieving analysis history: {str(e)}")
@@ -232,7 +475,7 @@ class DatabaseManager:
     def get_analysis_statistics(self):
         """Get database statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
                 # Total analyses count
@@ -274,30 +517,30 @@ class DatabaseManager:
     def search_analyses(self, search_term, limit=20):
         """Search analyses by filename or content"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 
-                cursor.execute('''
-                    SELECT id, filename, analyzed_at, overall_score, risk_level
-                    FROM analyses 
-                    WHERE filename LIKE ? OR analysis_data LIKE ?
-                    ORDER BY analyzed_at DESC 
-                    LIMIT ?
-                ''', (f'%{search_term}%', f'%{search_term}%', limit))
-                
-                results = cursor.fetchall()
+                fts_query = self._build_fts_query(search_term) if self.fts_enabled else ''
                 
-                search_results = []
-                for row in results:
-                    search_results.append({
-                        'id': row[0],
-                        'filename': row[1],
-                        'analyzed_at': row[2],
-                        'overall_score': row[3],
-                        'risk_level': row[4]
-                    })
+                if fts_query:
+                    cursor.execute('''
+                        SELECT id, filename, analyzed_at, overall_score, risk_level
+                        FROM analyses
+                        WHERE rowid IN (SELECT rowid FROM analyses_fts WHERE analyses_fts MATCH ?)
+                        ORDER BY analyzed_at DESC 
+                        LIMIT ?
+                    ''', (fts_query, limit))
+                else:
+                    cursor.execute('''
+                        SELECT id, filename, analyzed_at, overall_score, risk_level
+                        FROM analyses 
+                        WHERE filename LIKE ? OR analysis_json(analysis_data) LIKE ?
+                        ORDER BY analyzed_at DESC 
+                        LIMIT ?
+                    ''', (f'%{search_term}%', f'%{search_term}%', limit))
                 
-                return search_results
+                return [dict(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             logger.error(f"Error searching analyses: {str(e)}")
@@ -306,13 +549,14 @@ class DatabaseManager:
     def delete_analysis(self, analysis_id):
         """Delete analysis and all related data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
                 # Delete from all related tables
                 cursor.execute('DELETE FROM analysis_recommendations WHERE analysis_id = ?', (analysis_id,))
                 cursor.execute('DELETE FROM analysis_risks WHERE analysis_id = ?', (analysis_id,))
                 cursor.execute('DELETE FROM analysis_sections WHERE analysis_id = ?', (analysis_id,))
+                self._unindex_analyses(cursor, 'id = ?', (analysis_id,))
                 cursor.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
                 
                 conn.commit()
@@ -328,23 +572,28 @@ class DatabaseManager:
     def cleanup_old_analyses(self, days=90):
         """Clean up analyses older than specified days"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
-                # Get IDs of old analyses
-                cursor.execute('''
-                    SELECT id FROM analyses 
-                    WHERE analyzed_at < datetime('now', '-' || ? || ' days')
-                ''', (days,))
+                # Fix the cutoff once so every statement removes the same analyses
+                cursor.execute("SELECT datetime('now', '-' || ? || ' days')", (days,))
+                cutoff = cursor.fetchone()[0]
                 
-                old_ids = [row[0] for row in cursor.fetchall()]
+                # Delete child rows first, then the analyses themselves,
+                # all in one transaction
+                old_ids_query = 'SELECT id FROM analyses WHERE analyzed_at < ?'
+                for table in ('analysis_recommendations', 'analysis_risks', 'analysis_sections'):
+                    cursor.execute(
+                        f'DELETE FROM {table} WHERE analysis_id IN ({old_ids_query})', (cutoff,)
+                    )
+                self._unindex_analyses(cursor, f'id IN ({old_ids_query})', (cutoff,))
+                cursor.execute(f'DELETE FROM analyses WHERE id IN ({old_ids_query})', (cutoff,))
                 
-                # Delete old analyses
-                for analysis_id in old_ids:
-                    self.delete_analysis(analysis_id)
+                deleted_count = cursor.rowcount
+                conn.commit()
                 
-                logger.info(f"Cleaned up {len(old_ids)} old analyses")
-                return len(old_ids)
+                logger.info(f"Cleaned up {deleted_count} old analyses")
+                return deleted_count
                 
         except Exception as e:
             logger.error(f"Error cleaning up old analyses: {str(e)}")
@@ -353,7 +602,7 @@ class DatabaseManager:
     def export_data(self, format='json'):
         """Export all data in specified format"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -363,13 +612,11 @@ class DatabaseManager:
                     ORDER BY analyzed_at DESC
                 ''')
                 
-                results = cursor.fetchall()
-                
                 exported_data = []
-                for row in results:
+                for row in cursor:
                     try:
-                        analysis_data = json.loads(row[6]) if row[6] else {}
-                    except:
+                        analysis_data = _load_analysis(row[6]) if row[6] else {}
+                    except (zlib.error, ValueError):
                         analysis_data = {}
                     
                     exported_data.append({
@@ -383,9 +630,9 @@ class DatabaseManager:
                     })
                 
                 if format == 'json':
-                    return json.dumps(exported_data, indent=2, default=str)
-                else:
-                    return exported_data
+                    # Same indent=2 layout as before, serialized by orjson when available
+                    return _dumps(exported_data, indent=True)
+                return exported_data
                     
         except Exception as e:
             logger.error(f"Error exporting data: {str(e)}")
@@ -393,5 +640,6 @@ class DatabaseManager:
 
     def close(self):
         """Close database connections"""
-        # SQLite connections are automatically closed with context managers
+        with self._lock:
+            self._conn.close()
         logger.info("Database manager closed")
@@ -4,64 +4,160 @@ Natural Language Processing for DPR content analysis
 """
 
 import re
+import copy
+import random
+import hashlib
 import logging
+import threading
 from datetime import datetime
-from collections import Counter
-import json
-
-# Try to import NLP libraries
-try:
-    import nltk
-    from textblob import TextBlob
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    NLP_AVAILABLE = True
-    
-    # Download required NLTK data
-    try:
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-        nltk.data.find('corpora/wordnet')
-    except LookupError:
-        print("Downloading NLTK data...")
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        nltk.download('wordnet', quiet=True)
-        
-except ImportError:
-    NLP_AVAILABLE = False
-    print("Warning: NLP libraries not available. Using basic analysis.")
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# A run of terminators ("...", "?!") ends a single sentence
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+
+# Characters per slice when counting words, bounding the temporary token list
+WORD_COUNT_CHUNK_SIZE = 1 << 16
+
+def count_words(text):
+    """Count whitespace-separated words like len(text.split()), one slice at a time"""
+    word_count = 0
+    in_word = False
+    for start in range(0, len(text), WORD_COUNT_CHUNK_SIZE):
+        chunk = text[start:start + WORD_COUNT_CHUNK_SIZE]
+        word_count += len(chunk.split())
+        # A word running across the slice boundary was counted on both sides
+        if in_word and not chunk[0].isspace():
+            word_count -= 1
+        in_word = not chunk[-1].isspace()
+    return word_count
+
+def score_keyword_count(keyword_count):
+    """Piecewise-linear (score, completeness) for a section's keyword hit count, never above 95"""
+    if keyword_count >= 5:
+        return min(90, 60 + (keyword_count * 3)), min(95, 70 + (keyword_count * 2))
+    elif keyword_count >= 2:
+        return 50 + (keyword_count * 8), 50 + (keyword_count * 10)
+    else:
+        return max(30, keyword_count * 15), max(20, keyword_count * 20)
+
+SECTION_WEIGHTS = {
+    'Context/Background': 10,
+    'Problems Addressed': 15,
+    'Project Objectives': 15,
+    'Technology Issues': 10,
+    'Management Arrangements': 10,
+    'Means of Finance': 15,
+    'Time Frame': 10,
+    'Target Beneficiaries': 5,
+    'Legal Framework': 5,
+    'Risk Analysis': 5
+}
+
+# Section order and weight fractions as parallel tuples for scoring
+SECTION_NAMES = tuple(SECTION_WEIGHTS)
+SECTION_WEIGHT_FRACTIONS = tuple(weight / 100 for weight in SECTION_WEIGHTS.values())
+
+SECTION_KEYWORDS = {
+    'Context/Background': ['context', 'background', 'policy', 'sector', 'strategic', 'importance'],
+    'Problems Addressed': ['problem', 'issue', 'challenge', 'baseline', 'gap', 'need'],
+    'Project Objectives': ['objective', 'goal', 'target', 'deliverable', 'outcome', 'benefit'],
+    'Technology Issues': ['technology', 'technical', 'system', 'infrastructure', 'platform'],
+    'Management Arrangements': ['management', 'organization', 'structure', 'responsibility', 'governance'],
+    'Means of Finance': ['finance', 'budget', 'cost', 'funding', 'investment', 'expenditure'],
+    'Time Frame': ['timeline', 'schedule', 'duration', 'phase', 'milestone', 'completion'],
+    'Target Beneficiaries': ['beneficiary', 'stakeholder', 'community', 'user', 'participant'],
+    'Legal Framework': ['legal', 'regulation', 'compliance', 'approval', 'clearance', 'law'],
+    'Risk Analysis': ['risk', 'threat', 'vulnerability', 'mitigation', 'contingency']
+}
+
+QUALITY_INDICATORS = {
+    'Context/Background': ['policy', 'strategic', 'alignment', 'sector'],
+    'Problems Addressed': ['baseline', 'data', 'evidence', 'statistics'],
+    'Project Objectives': ['specific', 'measurable', 'achievable', 'relevant'],
+    'Technology Issues': ['technical', 'feasibility', 'specifications', 'architecture'],
+    'Management Arrangements': ['organization', 'roles', 'responsibilities', 'monitoring'],
+    'Means of Finance': ['budget', 'cost', 'estimates', 'financial'],
+    'Time Frame': ['timeline', 'milestones', 'schedule', 'phases'],
+    'Target Beneficiaries': ['stakeholders', 'beneficiaries', 'community', 'impact'],
+    'Legal Framework': ['compliance', 'regulations', 'approvals', 'legal'],
+    'Risk Analysis': ['risks', 'mitigation', 'contingency', 'management']
+}
+
+ACCURACY_INDICATORS = ['data', 'statistics', 'survey', 'study', 'research', 'evidence', 'source']
+BUDGET_INDICATORS = ['cost', 'budget', 'estimate', 'financial', 'rupees', 'crore', 'lakh']
+
+# Every distinct keyword, so each is counted once per document even
+# when several sections share it
+ALL_KEYWORDS = tuple(sorted({
+    keyword
+    for keyword_table in (SECTION_KEYWORDS, QUALITY_INDICATORS)
+    for keywords in keyword_table.values()
+    for keyword in keywords
+} | set(ACCURACY_INDICATORS) | set(BUDGET_INDICATORS)))
+
+# (lowest offset, number of offsets) for the fallback score, completeness
+# and quality jitter: -15..15, -10..20 and -12..12
+FALLBACK_JITTER_RANGES = ((-15, 31), (-10, 31), (-12, 25))
+
+# Number of distinct documents whose analysis is kept for repeat requests
+ANALYSIS_CACHE_SIZE = 128
+
+SECTION_ADVICE = {
+    'Context/Background': 'Include sectoral policy references and strategic importance',
+    'Problems Addressed': 'Provide comprehensive baseline data with statistical evidence',
+    'Project Objectives': 'Define clear, measurable, and time-bound objectives',
+    'Technology Issues': 'Add technical feasibility analysis and technology justification',
+    'Management Arrangements': 'Detail organizational structure and monitoring framework',
+    'Means of Finance': 'Include detailed budget breakdown with market-based estimates',
+    'Time Frame': 'Provide realistic timeline with PERT/CPM analysis',
+    'Target Beneficiaries': 'Conduct comprehensive stakeholder analysis',
+    'Legal Framework': 'Ensure all regulatory requirements are addressed',
+    'Risk Analysis': 'Develop comprehensive risk register with mitigation plans'
+}
+
+# Issue messages are fixed per section, so format them once
+LOW_QUALITY_ISSUES = {name: f"Low content quality in {name}" for name in SECTION_NAMES}
+INCOMPLETE_COVERAGE_ISSUES = {name: f"Incomplete coverage of {name} requirements" for name in SECTION_NAMES}
+SECTION_SPECIFIC_ISSUES = {
+    'Risk Analysis': "Insufficient risk identification and mitigation strategies",
+    'Means of Finance': "Budget details and cost estimates need improvement"
+}
+
+# Per-section keyword and indicator lists by position in SECTION_NAMES, so
+# scoring indexes tuples instead of hashing section names
+SECTION_INDEX = {section_name: index for index, section_name in enumerate(SECTION_NAMES)}
+SECTION_KEYWORD_LISTS = tuple(tuple(SECTION_KEYWORDS[name]) for name in SECTION_NAMES)
+
+# Keywords are ASCII, so their UTF-8 bytes match exactly where the str would
+ALL_KEYWORDS_BYTES = tuple((keyword, keyword.encode('utf-8')) for keyword in ALL_KEYWORDS)
+
 class DPRAnalyzer:
     def __init__(self):
-        self.section_weights = {
-            'Context/Background': 10,
-            'Problems Addressed': 15,
-            'Project Objectives': 15,
-            'Technology Issues': 10,
-            'Management Arrangements': 10,
-            'Means of Finance': 15,
-            'Time Frame': 10,
-            'Target Beneficiaries': 5,
-            'Legal Framework': 5,
-            'Risk Analysis': 5
-        }
-        
-        self.section_keywords = {
-            'Context/Background': ['context', 'background', 'policy', 'sector', 'strategic', 'importance'],
-            'Problems Addressed': ['problem', 'issue', 'challenge', 'baseline', 'gap', 'need'],
-            'Project Objectives': ['objective', 'goal', 'target', 'deliverable', 'outcome', 'benefit'],
-            'Technology Issues': ['technology', 'technical', 'system', 'infrastructure', 'platform'],
-            'Management Arrangements': ['management', 'organization', 'structure', 'responsibility', 'governance'],
-            'Means of Finance': ['finance', 'budget', 'cost', 'funding', 'investment', 'expenditure'],
-            'Time Frame': ['timeline', 'schedule', 'duration', 'phase', 'milestone', 'completion'],
-            'Target Beneficiaries': ['beneficiary', 'stakeholder', 'community', 'user', 'participant'],
-            'Legal Framework': ['legal', 'regulation', 'compliance', 'approval', 'clearance', 'law'],
-            'Risk Analysis': ['risk', 'threat', 'vulnerability', 'mitigation', 'contingency']
-        }
+        # Keyword tables are built once at import; instances share them
+        self.section_weights = SECTION_WEIGHTS
+        self.section_names = SECTION_NAMES
+        self.section_weight_fractions = SECTION_WEIGHT_FRACTIONS
+        self.section_keywords = SECTION_KEYWORDS
+        self.quality_indicators = QUALITY_INDICATORS
+        self.accuracy_indicators = ACCURACY_INDICATORS
+        self.budget_indicators = BUDGET_INDICATORS
+        self.all_keywords = ALL_KEYWORDS
+        self._all_keywords_bytes = ALL_KEYWORDS_BYTES
+        
+        # Issues and recommendations for sections with no keyword matches,
+        # which always score the same
+        absent_score, absent_completeness = score_keyword_count(0)
+        self._absent_section_notes = tuple(
+            (tuple(self.identify_section_issues(section_name, absent_score, absent_completeness)),
+             tuple(self.generate_section_recommendations(section_name, absent_score)))
+            for section_name in SECTION_NAMES
+        )
+        
+        # Recent analyses keyed by content digest, most recently used last
+        self._analysis_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         logger.info("DPR Analyzer initialized")
 
@@ -69,22 +165,40 @@ class DPRAnalyzer:
         """Perform comprehensive DPR analysis"""
         logger.info(f"Starting analysis for: {filename}")
         
+        cache_key = hashlib.blake2b(text_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._cache_lock:
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(cache_key)
+        
+        if cached is not None:
+            logger.info(f"Reusing cached analysis for identical content: {filename}")
+            return {
+                'filename': filename,
+                'analyzed_at': datetime.now().isoformat(),
+                **copy.deepcopy(cached)
+            }
+        
         try:
             # Basic document statistics
-            word_count = len(text_content.split())
-            sentence_count = len(re.split(r'[.!?]+', text_content))
+            word_count = count_words(text_content)
+            sentence_count = len(SENTENCE_END_PATTERN.findall(text_content)) + 1
             
-            # Analyze each section
-            section_analyses = {}
-            total_weighted_score = 0
+            # Lowercase once and count every keyword in a single pass
+            text_lower = text_content.lower()
+            keyword_counts = self.count_keywords(text_lower)
             
-            for section_name in self.section_weights.keys():
-                section_analysis = self.analyze_section(text_content, section_name)
-                section_analyses[section_name] = section_analysis
-                
-                weight = self.section_weights[section_name]
-                total_weighted_score += section_analysis['score'] * (weight / 100)
+            # Score each section from the shared counts; these are plain
+            # dict lookups, cheaper inline than dispatched to worker threads
+            section_analyses = {
+                section_name: self._analyze_section_at(keyword_counts, section_index)
+                for section_index, section_name in enumerate(self.section_names)
+            }
             
+            total_weighted_score = sum(
+                analysis['score'] * fraction
+                for analysis, fraction in zip(section_analyses.values(), self.section_weight_fractions)
+            )
             overall_score = round(total_weighted_score, 1)
             
             # Calculate completeness
@@ -93,7 +207,7 @@ class DPRAnalyzer:
             completeness_percentage = round((sections_found / len(self.section_weights)) * 100, 1)
             
             # Quality scores
-            quality_scores = self.calculate_quality_scores(text_content, section_analyses)
+            quality_scores = self.calculate_quality_scores(keyword_counts, section_analyses)
             
             result = {
                 'filename': filename,
@@ -107,10 +221,18 @@ class DPRAnalyzer:
                 'document_stats': {
                     'word_count': word_count,
                     'sentence_count': sentence_count,
-                    'readability': self.calculate_readability(text_content) if NLP_AVAILABLE else 70.0
+                    'readability': self.calculate_readability(word_count, sentence_count)
                 }
             }
             
+            # Cache everything except the per-request filename and timestamp
+            with self._cache_lock:
+                self._analysis_cache[cache_key] = copy.deepcopy(
+                    {key: value for key, value in result.items() if key not in ('filename', 'analyzed_at')}
+                )
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+            
             logger.info(f"Analysis completed. Overall score: {overall_score}")
             return result
             
@@ -118,59 +240,76 @@ class DPRAnalyzer:
             logger.error(f"Error in DPR analysis: {str(e)}")
             return self.generate_fallback_analysis(filename, text_content)
 
-    def analyze_section(self, text_content, section_name):
-        """Analyze individual DPR section"""
-        keywords = self.section_keywords.get(section_name, [])
-        text_lower = text_content.lower()
+    def analyze_batch(self, text_contents, filenames):
+        """Analyze several DPRs, returning results in input order"""
+        logger.info(f"Starting batch analysis of {len(text_contents)} documents")
+        
+        # Repeated documents in the batch are served from the analysis cache
+        return [
+            self.analyze_dpr(text_content, filename)
+            for text_content, filename in zip(text_contents, filenames)
+        ]
+
+    def count_keywords(self, text_lower):
+        """Count occurrences of every analysis keyword in the lowercased document"""
+        # Scan the UTF-8 bytes once encoded; bytes.count avoids the wide-char
+        # search str.count falls back to when the text has non-ASCII characters
+        text_bytes = text_lower.encode('utf-8', 'surrogatepass')
+        return {keyword: text_bytes.count(keyword_bytes)
+                for keyword, keyword_bytes in self._all_keywords_bytes}
+
+    def analyze_section(self, keyword_counts, section_name):
+        """Analyze individual DPR section from the document keyword counts"""
+        section_index = SECTION_INDEX.get(section_name)
+        if section_index is not None:
+            return self._analyze_section_at(keyword_counts, section_index)
+        
+        # Unknown sections have no keywords, so they score as absent
+        score, completeness = score_keyword_count(0)
+        return {
+            'score': score,
+            'completeness': completeness,
+            'quality': self.assess_section_quality(keyword_counts, section_name),
+            'keyword_matches': 0,
+            'issues': self.identify_section_issues(section_name, score, completeness),
+            'recommendations': self.generate_section_recommendations(section_name, score)
+        }
+
+    def _analyze_section_at(self, keyword_counts, section_index):
+        """Analyze the section at section_index in SECTION_NAMES"""
+        section_name = SECTION_NAMES[section_index]
         
         # Count keyword occurrences
-        keyword_count = sum(text_lower.count(keyword) for keyword in keywords)
+        keyword_count = sum(keyword_counts[keyword] for keyword in SECTION_KEYWORD_LISTS[section_index])
         
         # Basic scoring
-        if keyword_count >= 5:
-            score = min(90, 60 + (keyword_count * 3))
-            completeness = min(95, 70 + (keyword_count * 2))
-        elif keyword_count >= 2:
-            score = 50 + (keyword_count * 8)
-            completeness = 50 + (keyword_count * 10)
-        else:
-            score = max(30, keyword_count * 15)
-            completeness = max(20, keyword_count * 20)
+        score, completeness = score_keyword_count(keyword_count)
         
         # Quality assessment
-        quality = self.assess_section_quality(text_content, section_name)
+        quality = self.assess_section_quality(keyword_counts, section_name)
         
         # Generate issues and recommendations
-        issues = self.identify_section_issues(section_name, score, completeness)
-        recommendations = self.generate_section_recommendations(section_name, score)
+        if keyword_count == 0:
+            absent_issues, absent_recommendations = self._absent_section_notes[section_index]
+            issues = list(absent_issues)
+            recommendations = list(absent_recommendations)
+        else:
+            issues = self.identify_section_issues(section_name, score, completeness)
+            recommendations = self.generate_section_recommendations(section_name, score)
         
         return {
-            'score': min(100, score),
-            'completeness': min(100, completeness),
-            'quality': min(100, quality),
+            'score': score,
+            'completeness': completeness,
+            'quality': quality,
             'keyword_matches': keyword_count,
             'issues': issues,
             'recommendations': recommendations
         }
 
-    def assess_section_quality(self, text_content, section_name):
-        """Assess quality of section content"""
-        text_lower = text_content.lower()
-        quality_indicators = {
-            'Context/Background': ['policy', 'strategic', 'alignment', 'sector'],
-            'Problems Addressed': ['baseline', 'data', 'evidence', 'statistics'],
-            'Project Objectives': ['specific', 'measurable', 'achievable', 'relevant'],
-            'Technology Issues': ['technical', 'feasibility', 'specifications', 'architecture'],
-            'Management Arrangements': ['organization', 'roles', 'responsibilities', 'monitoring'],
-            'Means of Finance': ['budget', 'cost', 'estimates', 'financial'],
-            'Time Frame': ['timeline', 'milestones', 'schedule', 'phases'],
-            'Target Beneficiaries': ['stakeholders', 'beneficiaries', 'community', 'impact'],
-            'Legal Framework': ['compliance', 'regulations', 'approvals', 'legal'],
-            'Risk Analysis': ['risks', 'mitigation', 'contingency', 'management']
-        }
-        
-        indicators = quality_indicators.get(section_name, [])
-        quality_count = sum(text_lower.count(indicator) for indicator in indicators)
+    def assess_section_quality(self, keyword_counts, section_name):
+        """Assess quality of section content from the document keyword counts"""
+        indicators = self.quality_indicators.get(section_name, [])
+        quality_count = sum(keyword_counts[indicator] for indicator in indicators)
         
         return min(100, 50 + (quality_count * 10))
 
@@ -179,58 +318,40 @@ class DPRAnalyzer:
         issues = []
         
         if score < 50:
-            issues.append(f"Low content quality in {section_name}")
+            issues.append(LOW_QUALITY_ISSUES.get(section_name) or f"Low content quality in {section_name}")
         
         if completeness < 60:
-            issues.append(f"Incomplete coverage of {section_name} requirements")
+            issues.append(INCOMPLETE_COVERAGE_ISSUES.get(section_name)
+                          or f"Incomplete coverage of {section_name} requirements")
         
-        if section_name == 'Risk Analysis' and score < 70:
-            issues.append("Insufficient risk identification and mitigation strategies")
-        
-        if section_name == 'Means of Finance' and score < 70:
-            issues.append("Budget details and cost estimates need improvement")
+        if score < 70 and section_name in SECTION_SPECIFIC_ISSUES:
+            issues.append(SECTION_SPECIFIC_ISSUES[section_name])
         
         return issues
 
     def generate_section_recommendations(self, section_name, score):
         """Generate recommendations for section improvement"""
-        recommendations = []
-        
-        section_advice = {
-            'Context/Background': 'Include sectoral policy references and strategic importance',
-            'Problems Addressed': 'Provide comprehensive baseline data with statistical evidence',
-            'Project Objectives': 'Define clear, measurable, and time-bound objectives',
-            'Technology Issues': 'Add technical feasibility analysis and technology justification',
-            'Management Arrangements': 'Detail organizational structure and monitoring framework',
-            'Means of Finance': 'Include detailed budget breakdown with market-based estimates',
-            'Time Frame': 'Provide realistic timeline with PERT/CPM analysis',
-            'Target Beneficiaries': 'Conduct comprehensive stakeholder analysis',
-            'Legal Framework': 'Ensure all regulatory requirements are addressed',
-            'Risk Analysis': 'Develop comprehensive risk register with mitigation plans'
-        }
-        
-        if score < 75:
-            advice = section_advice.get(section_name, f"Improve {section_name} section quality")
-            recommendations.append(advice)
+        if score >= 75:
+            return []
         
-        return recommendations
+        return [SECTION_ADVICE.get(section_name) or f"Improve {section_name} section quality"]
 
-    def calculate_quality_scores(self, text_content, section_analyses):
+    def calculate_quality_scores(self, keyword_counts, section_analyses):
         """Calculate overall quality metrics"""
         # Data accuracy assessment
-        data_accuracy = self.assess_data_accuracy(text_content)
+        data_accuracy = self.assess_data_accuracy(keyword_counts)
         
         # Completeness based on section analysis
-        completeness = np.mean([analysis['completeness'] for analysis in section_analyses.values()])
+        completeness = sum(analysis['completeness'] for analysis in section_analyses.values()) / len(section_analyses)
         
         # Technical viability
-        technical_viability = self.assess_technical_viability(text_content, section_analyses)
+        technical_viability = self.assess_technical_viability(section_analyses)
         
         # Compliance with guidelines
         compliance = self.assess_compliance(section_analyses)
         
         # Budget realism
-        budget_realism = self.assess_budget_realism(text_content)
+        budget_realism = self.assess_budget_realism(keyword_counts)
         
         return {
             'data_accuracy': round(data_accuracy, 1),
@@ -240,14 +361,12 @@ class DPRAnalyzer:
             'budget_realism': round(budget_realism, 1)
         }
 
-    def assess_data_accuracy(self, text_content):
+    def assess_data_accuracy(self, keyword_counts):
         """Assess data accuracy indicators"""
-        text_lower = text_content.lower()
-        accuracy_indicators = ['data', 'statistics', 'survey', 'study', 'research', 'evidence', 'source']
-        indicator_count = sum(text_lower.count(indicator) for indicator in accuracy_indicators)
+        indicator_count = sum(keyword_counts[indicator] for indicator in self.accuracy_indicators)
         return min(100, 40 + (indicator_count * 8))
 
-    def assess_technical_viability(self, text_content, section_analyses):
+    def assess_technical_viability(self, section_analyses):
         """Assess technical viability"""
         tech_score = section_analyses.get('Technology Issues', {}).get('score', 50)
         return min(100, tech_score + 10)
@@ -261,40 +380,27 @@ class DPRAnalyzer:
         compliance_ratio = sections_present / required_sections
         return round(compliance_ratio * 100, 1)
 
-    def assess_budget_realism(self, text_content):
+    def assess_budget_realism(self, keyword_counts):
         """Assess budget realism"""
-        text_lower = text_content.lower()
-        budget_indicators = ['cost', 'budget', 'estimate', 'financial', 'rupees', 'crore', 'lakh']
-        indicator_count = sum(text_lower.count(indicator) for indicator in budget_indicators)
+        indicator_count = sum(keyword_counts[indicator] for indicator in self.budget_indicators)
         return min(100, 30 + (indicator_count * 12))
 
-    def calculate_readability(self, text_content):
-        """Calculate readability score using TextBlob"""
-        if not NLP_AVAILABLE:
-            return 70.0
-        
-        try:
-            blob = TextBlob(text_content)
-            sentences = len(blob.sentences)
-            words = len(blob.words)
-            
-            if sentences == 0:
-                return 50.0
-            
-            avg_sentence_length = words / sentences
-            
-            # Simple readability score
-            if avg_sentence_length < 15:
-                return 90.0
-            elif avg_sentence_length < 20:
-                return 75.0
-            elif avg_sentence_length < 25:
-                return 60.0
-            else:
-                return 45.0
-                
-        except Exception:
-            return 70.0
+    def calculate_readability(self, word_count, sentence_count):
+        """Calculate readability score from average sentence length"""
+        if word_count == 0 or sentence_count == 0:
+            return 50.0
+        
+        avg_sentence_length = word_count / sentence_count
+        
+        # Simple readability score
+        if avg_sentence_length < 15:
+            return 90.0
+        elif avg_sentence_length < 20:
+            return 75.0
+        elif avg_sentence_length < 25:
+            return 60.0
+        else:
+            return 45.0
 
     def generate_recommendations(self, analysis_result):
         """Generate overall recommendations based on analysis"""
@@ -339,17 +445,21 @@ class DPRAnalyzer:
 
     def generate_fallback_analysis(self, filename, text_content):
         """Generate basic analysis when NLP modules fail"""
-        word_count = len(text_content.split())
+        word_count = count_words(text_content)
         
         # Generate reasonable scores based on document length
         base_score = min(85, max(45, 40 + (word_count // 100)))
         
         section_analyses = {}
         for section_name in self.section_weights.keys():
+            score, completeness, quality = (
+                base_score + low + int(random.random() * span)
+                for low, span in FALLBACK_JITTER_RANGES
+            )
             section_analyses[section_name] = {
-                'score': base_score + np.random.randint(-15, 16),
-                'completeness': base_score + np.random.randint(-10, 21),
-                'quality': base_score + np.random.randint(-12, 13),
+                'score': score,
+                'completeness': completeness,
+                'quality': quality,
                 'issues': [],
                 'recommendations': []
             }